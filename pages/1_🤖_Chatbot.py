@@ -5,6 +5,7 @@ Handles UI layout, sidebar controls, model loading, and response streaming.
 
 import logging
 import os
+import time
 
 import streamlit as st
 
@@ -14,8 +15,8 @@ from src.chat import (  # type: ignore
     get_embedding_model,
 )
 from src.ingestion import create_index, get_opensearch_client
-from src.constants import OLLAMA_MODEL_NAME, OPENSEARCH_INDEX
-from src.utils import setup_logging
+from src.constants import OLLAMA_FAST_MODEL_NAME, OLLAMA_MODEL_NAME, OPENSEARCH_INDEX
+from src.utils import load_css, setup_logging
 
 
 # ---------------------------------------------------------------------
@@ -25,60 +26,20 @@ setup_logging()
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------
+# Streaming display settings
+# ---------------------------------------------------------------------
+STREAM_FLUSH_SECONDS = 0.04  # Max delay between UI refreshes while streaming
+STREAM_FLUSH_CHUNKS = 8  # Refresh early once this many chunks are buffered
+
+
 # ---------------------------------------------------------------------
 # Page setup
 # ---------------------------------------------------------------------
 st.set_page_config(page_title="Gen AI - Chatbot", page_icon="🤖")
 
-# Inject custom CSS styles
-st.markdown(
-    """
-    <style>
-    body { background-color: #f0f8ff; color: #002B5B; }
-    .sidebar .sidebar-content {
-        background-color: #006d77;
-        color: white;
-        padding: 20px;
-        border-right: 2px solid #003d5c;
-    }
-    .sidebar h2, .sidebar h4 { color: white; }
-    .block-container {
-        background-color: white;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0px 4px 12px rgba(0, 0, 0, 0.1);
-    }
-    .footer-text {
-        font-size: 1.1rem;
-        font-weight: bold;
-        color: black;
-        text-align: center;
-        margin-top: 10px;
-    }
-    .stButton button {
-        background-color: #118ab2;
-        color: white;
-        border-radius: 5px;
-        padding: 10px 20px;
-        font-size: 16px;
-    }
-    .stButton button:hover { background-color: #07a6c2; color: white; }
-    h1, h2, h3, h4 { color: #006d77; }
-    .stChatMessage {
-        background-color: #e0f7fa;
-        color: #006d77;
-        padding: 10px;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    .stChatMessage.user {
-        background-color: #118ab2;
-        color: white;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+# Inject custom CSS styles (read once and cached)
+st.markdown(load_css(), unsafe_allow_html=True)
 logger.info("Custom CSS successfully applied.")
 
 
@@ -152,6 +113,8 @@ def render_chatbot_page() -> None:
             with st.spinner("Initializing embedding + Ollama models..."):
                 get_embedding_model()
                 ensure_model_pulled(OLLAMA_MODEL_NAME)
+                if OLLAMA_FAST_MODEL_NAME:
+                    ensure_model_pulled(OLLAMA_FAST_MODEL_NAME)
                 st.session_state["embedding_models_loaded"] = True
         model_status.empty()
         logger.info("Embedding and Ollama models initialized.")
@@ -185,8 +148,10 @@ def render_chatbot_page() -> None:
                     chat_history=st.session_state["chat_history"],
                 )
 
-            # Stream tokens into UI
+            # Stream tokens into UI, re-rendering at most every flush interval
             if response_stream is not None:
+                pending = 0
+                last_flush = time.monotonic()
                 for chunk in response_stream:
                     if (
                         isinstance(chunk, dict)
@@ -194,7 +159,15 @@ def render_chatbot_page() -> None:
                         and "content" in chunk["message"]
                     ):
                         assembled_text += chunk["message"]["content"]
-                        response_placeholder.markdown(assembled_text + "▌")
+                        pending += 1
+                        now = time.monotonic()
+                        if (
+                            pending >= STREAM_FLUSH_CHUNKS
+                            or now - last_flush >= STREAM_FLUSH_SECONDS
+                        ):
+                            response_placeholder.markdown(assembled_text + "▌")
+                            pending = 0
+                            last_flush = now
                     else:
                         logger.error("Unexpected response chunk format.")
 
@@ -6,19 +6,23 @@ Handles ingestion into OpenSearch with embeddings for RAG search.
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator
 
 import streamlit as st
-from PyPDF2 import PdfReader
 
-from src.constants import OPENSEARCH_INDEX, TEXT_CHUNK_SIZE
-from src.embeddings import generate_embeddings, get_embedding_model
+from src.chat import retrieve_context
+from src.constants import TEXT_CHUNK_SIZE
+from src.embeddings import get_embedding_model, iter_embeddings
 from src.ingestion import (
     bulk_index_documents,
     create_index,
     delete_documents_by_document_name,
+    get_document_char_counts,
 )
+from src.ocr import extract_text_from_pdf
 from src.opensearch import get_opensearch_client
-from src.utils import chunk_text, setup_logging
+from src.utils import iter_chunks, load_css, setup_logging
 
 
 # ---------------------------------------------------------------------
@@ -33,50 +37,8 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------
 st.set_page_config(page_title="Gen AI - Upload Documents", page_icon="📂")
 
-# Custom CSS injection
-st.markdown(
-    """
-    <style>
-    body { background-color: #f0f8ff; color: #002B5B; }
-    .sidebar .sidebar-content {
-        background-color: #006d77;
-        color: white;
-        padding: 20px;
-        border-right: 2px solid #003d5c;
-    }
-    .sidebar h2, .sidebar h4 { color: white; }
-    .block-container {
-        background-color: white;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0px 4px 12px rgba(0,0,0,0.1);
-    }
-    .footer-text {
-        font-size: 1.1rem;
-        font-weight: bold;
-        color: black;
-        text-align: center;
-        margin-top: 10px;
-    }
-    .stButton button {
-        background-color: #118ab2;
-        color: white;
-        border-radius: 5px;
-        padding: 10px 20px;
-        font-size: 16px;
-    }
-    .stButton button:hover { background-color: #07a6c2; color: white; }
-    .stButton.delete-button button {
-        background-color: #e63946;
-        color: white;
-        font-size: 14px;
-    }
-    .stButton.delete-button button:hover { background-color: #ff4c4c; }
-    h1, h2, h3, h4 { color: #006d77; }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+# Custom CSS injection (read once and cached)
+st.markdown(load_css(), unsafe_allow_html=True)
 
 
 # ---------------------------------------------------------------------
@@ -131,30 +93,19 @@ def render_upload_page() -> None:
     # Initialize documents state
     st.session_state["documents"] = []
 
-    # Fetch existing document names from OpenSearch
-    agg_query = {
-        "size": 0,
-        "aggs": {"unique_docs": {"terms": {"field": "document_name", "size": 10000}}},
-    }
-    response = client.search(index=OPENSEARCH_INDEX, body=agg_query)
-    buckets = response["aggregations"]["unique_docs"]["buckets"]
-    indexed_docs = [bucket["key"] for bucket in buckets]
-    logger.info("Fetched indexed document names from OpenSearch.")
+    # Fetch existing document names and sizes from OpenSearch
+    doc_char_counts = get_document_char_counts()
+    indexed_docs = list(doc_char_counts)
 
     # Populate session with existing docs
-    for doc_name in indexed_docs:
+    for doc_name, char_count in doc_char_counts.items():
         file_path = os.path.join(upload_dir, doc_name)
-        if os.path.exists(file_path):
-            reader = PdfReader(file_path)
-            raw_text = "".join(page.extract_text() for page in reader.pages)
-            st.session_state["documents"].append(
-                {"filename": doc_name, "content": raw_text, "file_path": file_path}
-            )
-        else:
-            st.session_state["documents"].append(
-                {"filename": doc_name, "content": "", "file_path": None}
-            )
+        if not os.path.exists(file_path):
+            file_path = None
             logger.warning(f"File '{doc_name}' missing locally.")
+        st.session_state["documents"].append(
+            {"filename": doc_name, "char_count": char_count, "file_path": file_path}
+        )
 
     # Notify if any file was deleted
     if "deleted_file" in st.session_state:
@@ -168,37 +119,58 @@ def render_upload_page() -> None:
 
     if uploaded_files:
         with st.spinner("Processing and indexing documents..."):
+            new_files = []
             for file in uploaded_files:
                 if file.name in indexed_docs:
                     st.warning(f"The file '{file.name}' is already indexed.")
                     continue
+                new_files.append(file)
+            file_paths = [save_uploaded_file(file) for file in new_files]
+
+            # Extract text in worker threads while the main thread embeds and
+            # indexes the files already extracted, one batch at a time.
+            workers = max(1, min(len(file_paths), os.cpu_count() or 1))
+            failed_uploads = 0
+            with ThreadPoolExecutor(max_workers=workers) as extract_pool:
+                texts = extract_pool.map(extract_text_from_pdf, file_paths)
+
+                for file, file_path, pdf_text in zip(new_files, file_paths, texts):
+                    indexed, errors = bulk_index_documents(
+                        iter_documents(file.name, pdf_text)
+                    )
+                    if errors:
+                        failed_uploads += 1
+                        total = indexed + len(errors)
+                        logger.error(
+                            f"File '{file.name}': {len(errors)} of {total} chunks "
+                            "failed to index."
+                        )
+                        if not indexed:
+                            st.error(f"Failed to index '{file.name}'.")
+                            continue
+                        st.warning(
+                            f"Indexed '{file.name}' partially: {len(errors)} of "
+                            f"{total} chunks failed."
+                        )
+
+                    st.session_state["documents"].append(
+                        {
+                            "filename": file.name,
+                            "char_count": len(pdf_text),
+                            "file_path": file_path,
+                        }
+                    )
+                    indexed_docs.append(file.name)
+                    if not errors:
+                        logger.info(f"File '{file.name}' ingested successfully.")
 
-                file_path = save_uploaded_file(file)
-                reader = PdfReader(file_path)
-                raw_text = "".join(page.extract_text() for page in reader.pages)
-
-                # Chunk + embed text
-                chunks = chunk_text(raw_text, chunk_size=TEXT_CHUNK_SIZE, overlap=100)
-                vectors = generate_embeddings(chunks)
-
-                to_index = [
-                    {
-                        "doc_id": f"{file.name}_{i}",
-                        "text": chunk,
-                        "embedding": vector,
-                        "document_name": file.name,
-                    }
-                    for i, (chunk, vector) in enumerate(zip(chunks, vectors))
-                ]
-                bulk_index_documents(to_index)
-
-                st.session_state["documents"].append(
-                    {"filename": file.name, "content": raw_text, "file_path": file_path}
-                )
-                indexed_docs.append(file.name)
-                logger.info(f"File '{file.name}' ingested successfully.")
-
-        st.success("Upload and indexing complete!")
+            # Cached retrieval context predates the new documents
+            retrieve_context.clear()
+
+        if failed_uploads:
+            st.error(f"{failed_uploads} file(s) were not fully indexed.")
+        else:
+            st.success("Upload and indexing complete!")
 
     # Display/manage documents
     if st.session_state["documents"]:
@@ -208,7 +180,7 @@ def render_upload_page() -> None:
                 col1, col2 = st.columns([4, 1])
                 with col1:
                     st.write(
-                        f"{idx}. {doc['filename']} - {len(doc['content'])} characters extracted"
+                        f"{idx}. {doc['filename']} - {doc['char_count']} characters extracted"
                     )
                 with col2:
                     if st.button(
@@ -226,6 +198,7 @@ def render_upload_page() -> None:
                                 logger.error(f"Failed to locate '{doc['filename']}' on delete.")
                         # Delete from index
                         delete_documents_by_document_name(doc["filename"])
+                        retrieve_context.clear()
                         st.session_state["documents"].pop(idx - 1)
                         st.session_state["deleted_file"] = doc["filename"]
                         time.sleep(0.5)
@@ -233,8 +206,26 @@ def render_upload_page() -> None:
 
 
 # ---------------------------------------------------------------------
-# File helper
+# File helpers
 # ---------------------------------------------------------------------
+def iter_documents(file_name: str, pdf_text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily chunk and embed a document, yielding records for bulk indexing.
+    """
+    # Text from extract_text_from_pdf has already been through clean_text
+    chunks = iter_chunks(
+        pdf_text, chunk_size=TEXT_CHUNK_SIZE, overlap=100, already_clean=True
+    )
+    for i, (chunk, vector) in enumerate(iter_embeddings(chunks)):
+        yield {
+            "doc_id": f"{file_name}_{i}",
+            "text": chunk,
+            "embedding": vector,
+            "document_name": file_name,
+            "char_count": len(pdf_text),
+        }
+
+
 def save_uploaded_file(uploaded_file) -> str:  # type: ignore
     """
     Save an uploaded file to the `uploaded_files/` directory.
@@ -1,10 +1,19 @@
 import logging
+import re
 from typing import Dict, Iterable, List, Optional
 
+import numpy as np
 import ollama
 import streamlit as st
 
-from src.constants import ASSYMETRIC_EMBEDDING, OLLAMA_MODEL_NAME
+from src.constants import (
+    ASSYMETRIC_EMBEDDING,
+    OLLAMA_FAST_MODEL_NAME,
+    OLLAMA_MODEL_NAME,
+    OLLAMA_NUM_BATCH,
+    OLLAMA_NUM_CTX,
+    QUERY_VECTOR_DECIMALS,
+)
 from src.embeddings import get_embedding_model
 from src.opensearch import hybrid_search
 from src.utils import setup_logging
@@ -30,9 +39,12 @@ def ensure_model_pulled(model: str) -> bool:
     Returns:
         bool: True if model is ready, False on failure.
     """
+    # Untagged names refer to the ":latest" tag
+    wanted = model if ":" in model else f"{model}:latest"
     try:
         existing = ollama.list()
-        if model not in existing:
+        names = {entry["name"] for entry in existing.get("models", [])}
+        if wanted not in names:
             log.info("Model '%s' not found locally. Pulling from registry...", model)
             ollama.pull(model)
             log.info("Model '%s' successfully pulled and ready.", model)
@@ -47,36 +59,87 @@ def ensure_model_pulled(model: str) -> bool:
 # ---------------------------------------------------------------------
 # Model interaction
 # ---------------------------------------------------------------------
-def run_llama_streaming(prompt: str, temperature: float) -> Optional[Iterable[str]]:
+def run_llama_streaming(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    model: str = OLLAMA_MODEL_NAME,
+) -> Optional[Iterable[str]]:
     """
     Stream responses from the Ollama LLaMA model.
 
     Args:
-        prompt (str): Input prompt for the model.
+        messages (List[Dict[str, str]]): Chat messages, oldest first.
         temperature (float): Sampling temperature.
+        model (str, optional): Ollama model to run.
 
     Returns:
         Optional[Iterable[str]]: Stream of response chunks, or None on error.
     """
     try:
-        log.info("Initiating response stream from LLaMA model...")
+        log.info("Initiating response stream from model '%s'...", model)
         return ollama.chat(
-            model=OLLAMA_MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            messages=messages,
             stream=True,
-            options={"temperature": temperature},
+            options={
+                "temperature": temperature,
+                "num_ctx": OLLAMA_NUM_CTX,
+                "num_batch": OLLAMA_NUM_BATCH,
+            },
         )
     except ollama.ResponseError as exc:
         log.error("Error during model streaming: %s", exc.error)
         return None
 
 
+# ---------------------------------------------------------------------
+# Model routing
+# ---------------------------------------------------------------------
+COMPLEX_QUERY_KEYWORDS = ("why", "how", "explain", "compare", "summarize", "analyze")
+
+
+def select_model(query: str) -> str:
+    """
+    Pick the Ollama model for a query.
+
+    Short questions without reasoning keywords go to OLLAMA_FAST_MODEL_NAME
+    when one is configured; everything else uses OLLAMA_MODEL_NAME.
+
+    Args:
+        query (str): The user question.
+
+    Returns:
+        str: Name of the model to run.
+    """
+    if not OLLAMA_FAST_MODEL_NAME:
+        return OLLAMA_MODEL_NAME
+
+    # Tokenize on word characters so "Why?" or "explain," still match
+    words = re.findall(r"\w+", query.lower())
+    if len(words) <= 8 and not any(word in COMPLEX_QUERY_KEYWORDS for word in words):
+        return OLLAMA_FAST_MODEL_NAME
+    return OLLAMA_MODEL_NAME
+
+
 # ---------------------------------------------------------------------
 # Prompt construction
 # ---------------------------------------------------------------------
-def prompt_template(query: str, context: str, history: List[Dict[str, str]]) -> str:
+SYSTEM_PROMPT = (
+    "You are a knowledgeable chatbot assistant. Use the context supplied with "
+    "the latest question when it is relevant; otherwise answer to the best of "
+    "your knowledge."
+)
+
+
+def prompt_template(
+    query: str, context: str, history: List[Dict[str, str]]
+) -> List[Dict[str, str]]:
     """
-    Build the final prompt including context and conversation history.
+    Build the chat messages including context and conversation history.
+
+    The system message and prior turns are passed through unchanged, so
+    consecutive requests share a byte-identical prefix and Ollama can reuse
+    its KV cache. Retrieved context is attached to the latest user turn only.
 
     Args:
         query (str): The latest user query.
@@ -84,29 +147,75 @@ def prompt_template(query: str, context: str, history: List[Dict[str, str]]) ->
         history (List[Dict[str, str]]): Prior conversation messages.
 
     Returns:
-        str: Assembled prompt text.
+        List[Dict[str, str]]: Messages ready for `ollama.chat`.
     """
-    base_prompt = "You are a knowledgeable chatbot assistant. "
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    messages.extend(
+        {"role": message["role"], "content": message["content"]} for message in history
+    )
 
     if context:
-        base_prompt += (
-            "Use the following context to respond:\nContext:\n"
-            + context
-            + "\n"
-        )
+        user_content = f"Context:\n{context}\nQuestion: {query}"
     else:
-        base_prompt += "Answer to the best of your knowledge.\n"
-
-    if history:
-        base_prompt += "Conversation History:\n"
-        for message in history:
-            speaker = "User" if message["role"] == "user" else "Assistant"
-            base_prompt += f"{speaker}: {message['content']}\n"
-        base_prompt += "\n"
+        user_content = query
+    messages.append({"role": "user", "content": user_content})
 
-    final_prompt = f"{base_prompt}User: {query}\nAssistant:"
     log.info("Prompt successfully constructed with context and history.")
-    return final_prompt
+    return messages
+
+
+# ---------------------------------------------------------------------
+# Retrieval
+# ---------------------------------------------------------------------
+@st.cache_data(max_entries=512, show_spinner=False)
+def embed_query(search_query: str) -> List[float]:
+    """
+    Encode a search query, caching vectors so repeated queries skip inference.
+
+    Args:
+        search_query (str): Query text as passed to the embedding model.
+
+    Returns:
+        List[float]: Query embedding vector.
+    """
+    embedder = get_embedding_model()
+    embedding = embedder.encode(search_query, normalize_embeddings=True)
+
+    # Round in float64 so the list holds short decimals rather than the long
+    # float64 expansions of float32 values, shrinking the k-NN query ~2.5x.
+    vector: List[float] = np.round(
+        embedding.astype(np.float64), QUERY_VECTOR_DECIMALS
+    ).tolist()
+    return vector
+
+
+@st.cache_data(ttl=300, max_entries=512, show_spinner=False)
+def retrieve_context(query: str, num_results: int) -> str:
+    """
+    Run hybrid search for a query and format the hits as prompt context.
+
+    Results are cached for five minutes per (query, num_results), so repeated
+    or re-run questions avoid both the embedding pass and the OpenSearch call.
+    The cache is cleared whenever documents are indexed or deleted.
+
+    Args:
+        query (str): The user question.
+        num_results (int): Number of retrieved docs to include as context.
+
+    Returns:
+        str: Concatenated document snippets.
+    """
+    log.info("Performing hybrid search...")
+    search_query = f"passage: {query}" if ASSYMETRIC_EMBEDDING else query
+    vector = embed_query(search_query)
+
+    results = hybrid_search(query, vector, top_k=num_results)
+    log.info("Hybrid search completed with %d results.", len(results))
+
+    return "".join(
+        f"Document {idx}:\n{item['_source']['text']}\n\n"
+        for idx, item in enumerate(results)
+    )
 
 
 # ---------------------------------------------------------------------
@@ -133,25 +242,23 @@ def generate_response_streaming(
         Optional[Iterable[str]]: Stream of response text chunks.
     """
     chat_history = chat_history or []
-    recent_history = chat_history[-10:]  # Limit context to last 10 messages
+    # The UI appends the current query before calling us; it is re-added below
+    if chat_history and chat_history[-1] == {"role": "user", "content": query}:
+        chat_history = chat_history[:-1]
+    # Limit context to 10 messages: keep the opening exchange as a stable
+    # prompt prefix for Ollama's KV cache and trim from the middle
+    if len(chat_history) > 10:
+        recent_history = chat_history[:2] + chat_history[-8:]
+    else:
+        recent_history = chat_history
     context_snippets = ""
 
     # Fetch hybrid search results if enabled
     if use_hybrid_search:
-        log.info("Performing hybrid search...")
-        search_query = f"passage: {query}" if ASSYMETRIC_EMBEDDING else query
-
-        embedder = get_embedding_model()
-        vector = embedder.encode(search_query).tolist()
-
-        results = hybrid_search(query, vector, top_k=num_results)
-        log.info("Hybrid search completed with %d results.", len(results))
-
-        for idx, item in enumerate(results):
-            context_snippets += f"Document {idx}:\n{item['_source']['text']}\n\n"
+        context_snippets = retrieve_context(query, num_results)
 
-    # Construct the final prompt
-    prompt = prompt_template(query, context_snippets, recent_history)
+    # Construct the chat messages
+    messages = prompt_template(query, context_snippets, recent_history)
 
     # Run model with streaming
-    return run_llama_streaming(prompt, temperature)
+    return run_llama_streaming(messages, temperature, model=select_model(query))
@@ -5,6 +5,8 @@ This file centralizes model, embedding, logging, and OpenSearch settings
 so they can be reused consistently across the application.
 """
 
+import os
+
 # ---------------------------------------------------------------------
 # Embedding configuration
 # ---------------------------------------------------------------------
@@ -24,6 +26,31 @@ EMBEDDING_DIMENSION: int = 768
 # Maximum characters per text chunk when splitting documents
 TEXT_CHUNK_SIZE: int = 300
 
+# Embedding inference backend: "onnx" (ONNX Runtime via optimum) or "torch".
+EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "onnx")
+
+# Directory where the ONNX export of each embedding model is cached, so the
+# model is converted once rather than on every start.
+EMBEDDING_ONNX_DIR: str = "embedding_model_onnx/"
+
+# Whether to run the PyTorch embedding model with int8 dynamic quantization on CPU.
+# Set the environment variable EMBEDDING_INT8=0 to fall back to full FP32.
+EMBEDDING_INT8: bool = os.getenv("EMBEDDING_INT8", "1") != "0"
+
+# Number of chunks encoded per forward pass (lower this on small-memory machines)
+EMBEDDING_BATCH_SIZE: int = 64
+
+# Decimal places kept in query vectors sent to OpenSearch. The index stores
+# fp16 vectors, so extra digits only inflate the request JSON.
+QUERY_VECTOR_DECIMALS: int = 4
+
+
+# ---------------------------------------------------------------------
+# OCR configuration
+# ---------------------------------------------------------------------
+# Maximum number of Tesseract runs at once, shared by all PDFs being OCR-ed
+OCR_CONCURRENCY: int = int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 1))
+
 
 # ---------------------------------------------------------------------
 # Ollama model
@@ -31,6 +58,14 @@ TEXT_CHUNK_SIZE: int = 300
 # Name of the model used by Ollama for chatbot responses
 OLLAMA_MODEL_NAME: str = "llama3.2:1b"
 
+# Optional smaller model for short, simple questions (e.g. "qwen2.5:0.5b").
+# Leave empty to send every question to OLLAMA_MODEL_NAME.
+OLLAMA_FAST_MODEL_NAME: str = ""
+
+# Context window and prompt-processing batch size passed to Ollama
+OLLAMA_NUM_CTX: int = 4096
+OLLAMA_NUM_BATCH: int = 512
+
 
 # ---------------------------------------------------------------------
 # Fixed application settings (do not change)
@@ -39,6 +74,9 @@ OLLAMA_MODEL_NAME: str = "llama3.2:1b"
 # Logging
 LOG_FILE_PATH: str = "logs/app.log"  # Output file path for application logs
 
+# Styling
+CSS_FILE_PATH: str = "assets/style.css"  # Stylesheet shared by all pages
+
 # OpenSearch configuration
 OPENSEARCH_HOST: str = "localhost"   # OpenSearch hostname
 OPENSEARCH_PORT: int = 9200          # OpenSearch port
@@ -1,20 +1,37 @@
 """
 Embedding utilities for converting text into vector representations.
 
-This module wraps SentenceTransformers to load the model once,
-and generate embeddings for downstream semantic search.
+This module loads the embedding model once, preferring an ONNX Runtime
+export and falling back to SentenceTransformers, and generates embeddings
+for downstream semantic search.
 """
 
 import logging
-from typing import Any, List
+import os
+import shutil
+import tempfile
+from typing import Any, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
 import streamlit as st
+import torch
 from sentence_transformers import SentenceTransformer
 
-from src.constants import EMBEDDING_MODEL_PATH
+from src.constants import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_INT8,
+    EMBEDDING_MODEL_PATH,
+    EMBEDDING_ONNX_DIR,
+)
 from src.utils import setup_logging
 
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+except ImportError:  # fall back to the PyTorch backend
+    ORTModelForFeatureExtraction = None
+
 # ---------------------------------------------------------------------
 # Logging setup
 # ---------------------------------------------------------------------
@@ -22,35 +39,197 @@ setup_logging()
 log = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------
+# ONNX Runtime encoder
+# ---------------------------------------------------------------------
+class OnnxEmbedder:
+    """
+    Sentence encoder running the exported transformer on ONNX Runtime.
+
+    Reproduces the sentence-transformers pipeline used by the app (mean
+    pooling followed by L2 normalization) and exposes the same `encode`
+    call shape, so callers can use it in place of a SentenceTransformer.
+
+    The first run exports the model to ONNX and saves it, with its tokenizer,
+    under EMBEDDING_ONNX_DIR; later runs load the saved export directly.
+    """
+
+    def __init__(self, model_path: str, max_length: int = 384) -> None:
+        export_dir = os.path.join(EMBEDDING_ONNX_DIR, model_path.replace("/", "--"))
+        if os.path.isfile(os.path.join(export_dir, "model.onnx")):
+            log.info("Loading cached ONNX export from: %s", export_dir)
+            self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                export_dir, provider="CPUExecutionProvider"
+            )
+        else:
+            log.info("Exporting embedding model to ONNX: %s", model_path)
+            self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                model_path, export=True, provider="CPUExecutionProvider"
+            )
+            self.save_export(export_dir)
+        self.max_length = max_length
+
+    def save_export(self, export_dir: str) -> None:
+        """
+        Save the exported model and tokenizer to `export_dir`.
+
+        Files are written to a temporary sibling directory that is renamed
+        into place, so an interrupted save never leaves a partial export that
+        later runs would try to load.
+
+        Args:
+            export_dir (str): Destination directory.
+        """
+        parent = os.path.dirname(export_dir) or "."
+        os.makedirs(parent, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(dir=parent, prefix=".export_")
+        try:
+            self.model.save_pretrained(staging_dir)
+            self.tokenizer.save_pretrained(staging_dir)
+            os.replace(staging_dir, export_dir)
+            log.info("Saved ONNX export to: %s", export_dir)
+        except OSError as exc:
+            # e.g. another process finished the same export first
+            log.warning("Could not save ONNX export to %s: %s", export_dir, exc)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        **_: Any,
+    ) -> np.ndarray[Any, Any]:
+        """
+        Encode one sentence or a list of sentences.
+
+        Args:
+            sentences (Union[str, List[str]]): Text(s) to encode.
+            batch_size (int, optional): Sentences per inference call.
+            **_: Extra SentenceTransformer keyword arguments, ignored.
+
+        Returns:
+            np.ndarray[Any, Any]: 1-D vector for a single string, otherwise
+            an array of shape (len(sentences), dim).
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            token_states = self.model(**inputs).last_hidden_state
+
+            # Mean pooling over non-padding tokens, then L2 normalization
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_states * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.clip(norms, 1e-12, None))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = np.concatenate(batches).astype(np.float32)
+        return vectors[0] if single else vectors
+
+
 # ---------------------------------------------------------------------
 # Model loading
 # ---------------------------------------------------------------------
 @st.cache_resource(show_spinner=False)
-def get_embedding_model() -> SentenceTransformer:
+def get_embedding_model() -> Union[OnnxEmbedder, SentenceTransformer]:
     """
     Load the embedding model and cache it across sessions.
 
+    The ONNX Runtime encoder is used when EMBEDDING_BACKEND is "onnx" and
+    optimum is installed. Otherwise the PyTorch SentenceTransformer is
+    loaded, and on CPU its linear layers are quantized to int8 unless
+    EMBEDDING_INT8 is disabled.
+
     Returns:
-        SentenceTransformer: Pretrained embedding model instance.
+        Union[OnnxEmbedder, SentenceTransformer]: Model exposing `encode`.
     """
     log.info("Loading embedding model from: %s", EMBEDDING_MODEL_PATH)
-    return SentenceTransformer(EMBEDDING_MODEL_PATH)
+    if EMBEDDING_BACKEND == "onnx":
+        if ORTModelForFeatureExtraction is not None:
+            log.info("Using ONNX Runtime embedding backend.")
+            return OnnxEmbedder(EMBEDDING_MODEL_PATH)
+        log.warning("optimum[onnxruntime] not installed; using PyTorch backend.")
+
+    model = SentenceTransformer(EMBEDDING_MODEL_PATH)
+
+    if EMBEDDING_INT8 and model.device.type == "cpu":
+        transformer = model._first_module()
+        transformer.auto_model = torch.quantization.quantize_dynamic(
+            transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        log.info("Embedding model quantized to int8 (dynamic).")
+    return model
 
 
 # ---------------------------------------------------------------------
 # Embedding generation
 # ---------------------------------------------------------------------
-def generate_embeddings(chunks: List[str]) -> List[np.ndarray[Any, Any]]:
+def generate_embeddings(
+    chunks: List[str], batch_size: int = EMBEDDING_BATCH_SIZE
+) -> np.ndarray[Any, Any]:
     """
     Generate vector embeddings for a list of text segments.
 
+    All segments are encoded in a single batched call, so tokenization and
+    model invocation are amortized across each batch instead of per chunk.
+    Vectors are L2-normalized to match the inner-product k-NN space.
+
     Args:
         chunks (List[str]): Text segments to encode.
+        batch_size (int, optional): Segments per forward pass.
 
     Returns:
-        List[np.ndarray[Any, Any]]: Embedding vectors for each segment.
+        np.ndarray[Any, Any]: Array of shape (len(chunks), dim), one row per segment.
     """
     model = get_embedding_model()
-    vectors = [np.array(model.encode(segment)) for segment in chunks]
+    vectors = model.encode(
+        chunks,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
     log.info("Generated embeddings for %d chunks.", len(chunks))
     return vectors
+
+
+def iter_embeddings(
+    chunks: Iterable[str], batch_size: int = EMBEDDING_BATCH_SIZE
+) -> Iterator[Tuple[str, np.ndarray[Any, Any]]]:
+    """
+    Embed a stream of text segments one batch at a time.
+
+    Only a single batch of segments and vectors is held in memory, which
+    keeps peak usage flat for large documents.
+
+    Args:
+        chunks (Iterable[str]): Text segments to encode.
+        batch_size (int, optional): Segments per forward pass.
+
+    Yields:
+        Tuple[str, np.ndarray[Any, Any]]: Each segment with its vector.
+    """
+    batch: List[str] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield from zip(batch, generate_embeddings(batch, batch_size))
+            batch = []
+
+    if batch:
+        yield from zip(batch, generate_embeddings(batch, batch_size))
@@ -7,8 +7,10 @@ with documents and their embeddings for semantic search.
 
 import json
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
 
+import numpy as np
+import streamlit as st
 from opensearchpy import OpenSearch, helpers
 
 from src.constants import ASSYMETRIC_EMBEDDING, EMBEDDING_DIMENSION, OPENSEARCH_INDEX
@@ -25,10 +27,13 @@ log = logging.getLogger(__name__)
 # ---------------------------------------------------------------------
 # Index configuration and lifecycle
 # ---------------------------------------------------------------------
+@st.cache_data(show_spinner=False)
 def load_index_config() -> Dict[str, Any]:
     """
     Load index configuration from JSON file and adjust for embedding dimension.
 
+    The parsed file is cached, so reruns do not touch the disk again.
+
     Returns:
         Dict[str, Any]: Parsed configuration dictionary.
     """
@@ -41,16 +46,20 @@ def load_index_config() -> Dict[str, Any]:
     return config if isinstance(config, dict) else {}
 
 
-def create_index(client: OpenSearch) -> None:
+@st.cache_resource(show_spinner=False)
+def create_index(_client: OpenSearch) -> None:
     """
     Create a new index if it does not already exist.
 
+    The check runs once per process; `delete_index` clears the cache so the
+    next call recreates the index.
+
     Args:
-        client (OpenSearch): Client instance.
+        _client (OpenSearch): Client instance (not hashed by the cache).
     """
-    body = load_index_config()
-    if not client.indices.exists(index=OPENSEARCH_INDEX):
-        resp = client.indices.create(index=OPENSEARCH_INDEX, body=body)
+    if not _client.indices.exists(index=OPENSEARCH_INDEX):
+        body = load_index_config()
+        resp = _client.indices.create(index=OPENSEARCH_INDEX, body=body)
         log.info("Index '%s' created: %s", OPENSEARCH_INDEX, resp)
     else:
         log.info("Index '%s' already exists.", OPENSEARCH_INDEX)
@@ -65,6 +74,8 @@ def delete_index(client: OpenSearch) -> None:
     """
     if client.indices.exists(index=OPENSEARCH_INDEX):
         resp = client.indices.delete(index=OPENSEARCH_INDEX)
+        create_index.clear()
+        get_document_char_counts.clear()
         log.info("Index '%s' deleted: %s", OPENSEARCH_INDEX, resp)
     else:
         log.info("Index '%s' does not exist.", OPENSEARCH_INDEX)
@@ -73,48 +84,75 @@ def delete_index(client: OpenSearch) -> None:
 # ---------------------------------------------------------------------
 # Document operations
 # ---------------------------------------------------------------------
-def bulk_index_documents(documents: List[Dict[str, Any]]) -> Tuple[int, List[Any]]:
+def build_bulk_action(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a document record into an OpenSearch bulk index action.
+
+    Args:
+        doc (Dict[str, Any]): Record with the keys listed in
+            `bulk_index_documents`.
+
+    Returns:
+        Dict[str, Any]: Bulk action targeting the configured index.
+    """
+    # Prefix text for asymmetric embedding, if enabled
+    text_value = f"passage: {doc['text']}" if ASSYMETRIC_EMBEDDING else doc["text"]
+
+    return {
+        "_index": OPENSEARCH_INDEX,
+        "_id": doc["doc_id"],
+        "_source": {
+            "text": text_value,
+            # Index stores fp16 vectors; cast early to halve in-flight batch size
+            "embedding": np.asarray(doc["embedding"], dtype=np.float16),
+            "document_name": doc["document_name"],
+            "char_count": doc["char_count"],
+        },
+    }
+
+
+def bulk_index_documents(documents: Iterable[Dict[str, Any]]) -> Tuple[int, List[Any]]:
     """
     Index multiple documents in bulk.
 
+    Documents are consumed lazily and sent in batches, so a generator keeps
+    memory bounded to roughly one batch.
+
     Args:
-        documents (List[Dict[str, Any]]): Each item must include
+        documents (Iterable[Dict[str, Any]]): Each item must include
             - doc_id
             - text
             - embedding
             - document_name
+            - char_count (length of the whole source document's text)
 
     Returns:
         Tuple[int, List[Any]]: (Number indexed, list of errors)
     """
     client = get_opensearch_client()
-    actions = []
-
-    for doc in documents:
-        doc_id = doc["doc_id"]
-        embedding_vector = doc["embedding"].tolist()
-        doc_name = doc["document_name"]
-
-        # Prefix text for asymmetric embedding, if enabled
-        text_value = f"passage: {doc['text']}" if ASSYMETRIC_EMBEDDING else doc["text"]
-
-        actions.append(
-            {
-                "_index": OPENSEARCH_INDEX,
-                "_id": doc_id,
-                "_source": {
-                    "text": text_value,
-                    "embedding": embedding_vector,
-                    "document_name": doc_name,
-                },
-            }
-        )
-
-    # Execute bulk operation
-    success_count, error_list = helpers.bulk(client, actions)
+    actions = (build_bulk_action(doc) for doc in documents)
+
+    # Execute bulk operation, streaming batches to OpenSearch
+    success_count = 0
+    error_list: List[Any] = []
+    # Rejected documents are collected rather than raised, so one bad chunk
+    # does not abort the rest of the stream
+    for ok, item in helpers.streaming_bulk(
+        client, actions, chunk_size=500, raise_on_error=False
+    ):
+        if ok:
+            success_count += 1
+        else:
+            error_list.append(item)
+            log.error("Failed to index document: %s", item)
+
+    # Make the new chunks searchable before callers drop cached results, so
+    # the next query cannot re-cache a pre-ingest view of the index
+    client.indices.refresh(index=OPENSEARCH_INDEX)
+    get_document_char_counts.clear()
     log.info(
         "Bulk indexed %d documents into '%s' with %d errors.",
-        len(documents),
+        success_count,
         OPENSEARCH_INDEX,
         len(error_list),
     )
@@ -134,10 +172,43 @@ def delete_documents_by_document_name(document_name: str) -> Dict[str, Any]:
     client = get_opensearch_client()
     query = {"query": {"term": {"document_name": document_name}}}
 
-    resp: Dict[str, Any] = client.delete_by_query(index=OPENSEARCH_INDEX, body=query)
+    resp: Dict[str, Any] = client.delete_by_query(
+        index=OPENSEARCH_INDEX, body=query, refresh=True
+    )
+    get_document_char_counts.clear()
     log.info(
         "Deleted documents where document_name='%s' from index '%s'.",
         document_name,
         OPENSEARCH_INDEX,
     )
     return resp
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_document_char_counts() -> Dict[str, int]:
+    """
+    Fetch the indexed document names with their extracted character counts.
+
+    Counts are read from the `char_count` field stored at ingest time, so no
+    source PDF has to be parsed again. Results are cached for a minute and
+    invalidated whenever documents are indexed or deleted.
+
+    Returns:
+        Dict[str, int]: Character count per document name (0 if unknown).
+    """
+    client = get_opensearch_client()
+    agg_query = {
+        "size": 0,
+        "aggs": {
+            "unique_docs": {
+                "terms": {"field": "document_name", "size": 10000},
+                "aggs": {"char_count": {"max": {"field": "char_count"}}},
+            }
+        },
+    }
+    response = client.search(index=OPENSEARCH_INDEX, body=agg_query)
+    buckets = response["aggregations"]["unique_docs"]["buckets"]
+    log.info("Fetched indexed document names from OpenSearch.")
+    return {
+        bucket["key"]: int(bucket["char_count"]["value"] or 0) for bucket in buckets
+    }
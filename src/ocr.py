@@ -2,18 +2,33 @@
 PDF and image OCR utilities.
 
 This module handles text extraction from PDF files. It attempts native
-text extraction first, and falls back to OCR on images when necessary.
+text extraction first (via PDFium), and falls back to OCR on a rendered
+page image when necessary. OCR runs concurrently across pages, bounded by
+OCR_CONCURRENCY, using the in-process tesserocr API when available and
+Tesseract subprocesses otherwise.
 """
 
+import asyncio
+import contextlib
+import hashlib
 import io
 import logging
-from typing import Optional
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-import pytesseract
-from PIL import Image
-from PyPDF2 import PageObject, PdfReader
+import aiopytesseract
+import pypdfium2 as pdfium
+from PIL import Image, ImageOps
 
-from src.constants import LOG_FILE_PATH
+from src.constants import LOG_FILE_PATH, OCR_CONCURRENCY
 from src.utils import clean_text, setup_logging
 
 # ---------------------------------------------------------------------
@@ -22,6 +37,52 @@ from src.utils import clean_text, setup_logging
 setup_logging()
 log = logging.getLogger(__name__)
 
+# Keep each Tesseract process single-threaded; parallelism comes from
+# running several processes at once, and nested OpenMP threads oversubscribe.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    from tesserocr import OEM, PyTessBaseAPI
+except ImportError:  # fall back to Tesseract subprocesses
+    PyTessBaseAPI = None
+
+# PDFium is not thread-safe, so all document access within a process is
+# serialized; documents with many pages are split across processes instead.
+PDFIUM_LOCK = threading.Lock()
+
+# Documents with at least this many pages are parsed in worker processes
+PDF_PARALLEL_MIN_PAGES = 16
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+# Scanned pages are rendered at this multiple of 72 dpi before OCR
+OCR_RENDER_SCALE = 2
+
+# Pages are rendered at a lower scale if needed so their longest side is at
+# most this many pixels
+OCR_MAX_IMAGE_SIDE = 2500
+
+# Scanned pages are rendered and OCR-ed this many at a time, which bounds the
+# number of page bitmaps held in memory (~2 MB each for a letter page)
+OCR_WINDOW_PAGES = 32
+
+# Without tesserocr, more pages than this are OCR-ed through image list files,
+# one Tesseract run per concurrent slot, so each run loads the model once.
+OCR_BATCH_MIN_IMAGES = 8
+
+# Seconds allowed per image; the Tesseract timeout covers a whole subprocess,
+# so list-file runs get this multiplied by their image count.
+OCR_TIMEOUT_PER_IMAGE = 30
+
+# Tesseract runs are bounded across every document extracted in this process,
+# so concurrent uploads share OCR_CONCURRENCY slots instead of each getting
+# their own; tesserocr engines are likewise created once and shared.
+OCR_SLOTS = threading.BoundedSemaphore(OCR_CONCURRENCY)
+_ocr_engines: Optional[queue.SimpleQueue] = None
+_ocr_engines_checked = False
+_ocr_engines_lock = threading.Lock()
+
 
 # ---------------------------------------------------------------------
 # PDF text extraction
@@ -30,57 +91,522 @@ def extract_text_from_pdf(file_path: str) -> str:
     """
     Extract text from a PDF file, with OCR fallback if plain extraction fails.
 
+    Long documents are split into contiguous page ranges whose text layers
+    are read in worker processes, which sidesteps both the GIL and PDFium's
+    lack of thread safety. Pages without a text layer are then rendered and
+    OCR-ed in windows of OCR_WINDOW_PAGES, so their Tesseract runs overlap
+    while memory stays bounded regardless of page count.
+
     Args:
         file_path (str): Path to the PDF file.
 
     Returns:
         str: Cleaned text extracted from the PDF.
     """
-    collected_text = ""
-
+    # Read the file once; PDFium parses the in-memory bytes without copying
     with open(file_path, "rb") as pdf_file:
-        reader = PdfReader(pdf_file)
-        log.info("Opened PDF for extraction: %s", file_path)
+        pdf_data = pdf_file.read()
+
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_data)
+        num_pages = len(pdf)
+        pdf.close()
+    log.info("Opened PDF for extraction: %s (%d pages)", file_path, num_pages)
 
-        for idx, page in enumerate(reader.pages):
+    page_texts: List[Optional[str]] = []
+
+    if num_pages < PDF_PARALLEL_MIN_PAGES:
+        page_texts = extract_page_range(pdf_data, 0, num_pages)
+    else:
+        # Workers open the file by path (served from the OS page cache)
+        # rather than receiving a pickled copy of the whole document each.
+        workers = min(PDF_EXTRACT_WORKERS, num_pages)
+        bounds = [num_pages * i // workers for i in range(workers + 1)]
+        for attempt in range(2):
+            pool = get_page_pool()
             try:
-                page_content = page.extract_text()
-                if page_content:
-                    collected_text += page_content
-                    log.info("Page %d extracted without OCR.", idx)
-                else:
-                    log.info("No text found on page %d. Running OCR...", idx)
-                    collected_text += extract_text_from_images(page)
-            except Exception as exc:
-                log.error("Error while processing page %d: %s", idx, exc)
+                page_texts = []
+                for texts in pool.map(
+                    partial(extract_page_range, file_path), bounds[:-1], bounds[1:]
+                ):
+                    page_texts.extend(texts)
+                break
+            except BrokenProcessPool:
+                # A worker died (e.g. PDFium crashed or it was killed for
+                # memory); replace the pool so later documents still work.
+                discard_page_pool(pool)
+                if attempt:
+                    raise
+                log.warning("Page extraction pool broke on %s; retrying.", file_path)
 
-    result = clean_text(collected_text)
+    ocr_indices = [idx for idx, text in enumerate(page_texts) if text is None]
+    if ocr_indices:
+        ocr_results = asyncio.run(extract_text_from_pages(pdf_data, ocr_indices))
+        failed = 0
+        for idx, ocr_text in zip(ocr_indices, ocr_results):
+            if ocr_text is None:
+                failed += 1
+            page_texts[idx] = ocr_text or ""
+        if failed:
+            log.error(
+                "OCR failed for %d of %d scanned pages in %s; their text is missing.",
+                failed,
+                len(ocr_indices),
+                file_path,
+            )
+
+    result = clean_text("\n".join(text or "" for text in page_texts))
     log.info("Completed text extraction for %s", file_path)
     return result
 
 
+def extract_page_range(
+    source: Union[str, bytes], start: int, stop: int
+) -> List[Optional[str]]:
+    """
+    Read the text layer of pages [start, stop).
+
+    Top-level so it can run in a worker process; the document is opened once
+    per range rather than once per page.
+
+    Args:
+        source (Union[str, bytes]): Path to the PDF file, or its contents.
+        start (int): Index of the first page.
+        stop (int): Index one past the last page.
+
+    Returns:
+        List[Optional[str]]: Text per page; None for pages without a text
+        layer, which need OCR.
+    """
+    page_texts: List[Optional[str]] = []
+
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            for idx in range(start, stop):
+                page_texts.append("")
+                page = None
+                try:
+                    page = pdf[idx]
+                    textpage = page.get_textpage()
+                    page_content = textpage.get_text_bounded().replace("\r\n", "\n")
+                    textpage.close()
+                    if page_content.strip():
+                        page_texts[-1] = page_content
+                        log.debug("Page %d extracted without OCR.", idx)
+                    else:
+                        page_texts[-1] = None
+                        log.debug("No text found on page %d. Queued for OCR.", idx)
+                except Exception as exc:
+                    log.error("Error while processing page %d: %s", idx, exc)
+                finally:
+                    if page is not None:
+                        page.close()
+        finally:
+            pdf.close()
+
+    return page_texts
+
+
+def get_page_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool used for page extraction, creating it on first use.
+
+    A single pool is shared by every caller, so documents extracted
+    concurrently from several threads do not each spawn a full set of
+    processes. Workers are spawned rather than forked: a fork taken while
+    another thread holds PDFIUM_LOCK would copy the lock in its held state,
+    and no thread in the worker could ever release it.
+
+    Returns:
+        ProcessPoolExecutor: Pool with PDF_EXTRACT_WORKERS processes.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=setup_logging,
+            )
+        return _page_pool
+
+
+def discard_page_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken page pool so the next `get_page_pool` call creates a new one.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool that failed; ignored if another
+            thread has already replaced it.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False)
+
+
+def render_pages(
+    pdf: "pdfium.PdfDocument", page_indices: List[int]
+) -> List[Optional[Image.Image]]:
+    """
+    Render pages as grayscale images for OCR.
+
+    Each page is rendered at OCR_RENDER_SCALE, reduced where needed so its
+    longest side fits OCR_MAX_IMAGE_SIDE. The resulting resolution is stored
+    in the image's "dpi" info so Tesseract is told the true scale.
+
+    Args:
+        pdf (pdfium.PdfDocument): Open document.
+        page_indices (List[int]): Pages to render.
+
+    Returns:
+        List[Optional[Image.Image]]: One image per page, in the given order;
+        None for pages that could not be rendered.
+    """
+    images: List[Optional[Image.Image]] = []
+    for idx in page_indices:
+        image = None
+        try:
+            with PDFIUM_LOCK:
+                page = pdf[idx]
+                try:
+                    longest_side = max(page.get_size())
+                    scale = min(OCR_RENDER_SCALE, OCR_MAX_IMAGE_SIDE / longest_side)
+                    image = page.render(scale=scale, grayscale=True).to_pil()
+                finally:
+                    page.close()
+            dpi = round(72 * scale)
+            image.info["dpi"] = (dpi, dpi)
+        except Exception as exc:
+            log.error("Error while rendering page %d: %s", idx, exc)
+            image = None
+        images.append(image)
+    return images
+
+
 # ---------------------------------------------------------------------
-# OCR fallback for page images
+# OCR fallback for scanned pages
 # ---------------------------------------------------------------------
-def extract_text_from_images(page: PageObject) -> str:
+async def extract_text_from_pages(
+    source: Union[str, bytes], page_indices: List[int]
+) -> List[Optional[str]]:
     """
-    Run OCR on images contained in a PDF page.
+    Render and OCR scanned pages, one window of OCR_WINDOW_PAGES at a time.
+
+    Each document runs at most OCR_CONCURRENCY pages at once, and every run
+    also holds one of the process-wide OCR_SLOTS. Results are cached by image
+    content across windows, so repeated pages (e.g. blank or boilerplate
+    pages) are recognized once.
 
     Args:
-        page (PageObject): A PDF page object.
+        source (Union[str, bytes]): Path to the PDF file, or its contents.
+        page_indices (List[int]): Pages without a text layer.
 
     Returns:
-        str: Concatenated OCR results from images.
+        List[Optional[str]]: OCR text per page, in the given order, or None
+        where recognition failed.
     """
-    text_output = ""
+    workers = max(1, min(OCR_CONCURRENCY, len(page_indices)))
+    semaphore = asyncio.Semaphore(workers)
+    api_pool = get_ocr_engines()
+    ocr_cache: Dict[bytes, Optional[str]] = {}
+    results: List[Optional[str]] = []
+
+    # One worker thread per in-flight page, each waiting for or holding an
+    # OCR slot; the loop is private to this asyncio.run call, so the
+    # executor is shut down with it.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+    )
+
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+    try:
+        for start in range(0, len(page_indices), OCR_WINDOW_PAGES):
+            window = page_indices[start : start + OCR_WINDOW_PAGES]
+            images = await asyncio.to_thread(render_pages, pdf, window)
+            # Pages that failed to render keep None, counted as OCR failures
+            texts = iter(
+                await extract_text_from_images(
+                    [image for image in images if image is not None],
+                    workers,
+                    semaphore,
+                    api_pool,
+                    ocr_cache,
+                )
+            )
+            results.extend(None if image is None else next(texts) for image in images)
+    finally:
+        with PDFIUM_LOCK:
+            pdf.close()
+
+    return results
+
+
+def get_ocr_engines() -> Optional[queue.SimpleQueue]:
+    """
+    Return the shared tesserocr engines, creating them on first use.
+
+    One engine per OCR slot is created once per process and reused for every
+    page of every document, so the language model is loaded only
+    OCR_CONCURRENCY times.
 
-    for image_obj in page.images:
+    Returns:
+        Optional[queue.SimpleQueue]: Idle engines, or None when tesserocr is
+        unavailable and Tesseract subprocesses are used instead.
+    """
+    global _ocr_engines, _ocr_engines_checked
+    with _ocr_engines_lock:
+        if not _ocr_engines_checked and PyTessBaseAPI is not None:
+            _ocr_engines_checked = True
+            apis = []
+            try:
+                for _ in range(OCR_CONCURRENCY):
+                    apis.append(PyTessBaseAPI(lang="eng", oem=OEM.LSTM_ONLY))
+            except Exception as exc:
+                # e.g. missing tessdata or no LSTM model; the CLI may still work
+                log.warning("tesserocr unavailable, using Tesseract CLI: %s", exc)
+                for api in apis:
+                    api.End()
+            else:
+                _ocr_engines = queue.SimpleQueue()
+                for api in apis:
+                    _ocr_engines.put(api)
+        return _ocr_engines
+
+
+@contextlib.asynccontextmanager
+async def ocr_slot() -> AsyncIterator[None]:
+    """
+    Hold one of the process-wide OCR_SLOTS without blocking the event loop.
+    """
+    await asyncio.to_thread(OCR_SLOTS.acquire)
+    try:
+        yield
+    finally:
+        OCR_SLOTS.release()
+
+
+async def extract_text_from_images(
+    images: List[Image.Image],
+    workers: int,
+    semaphore: asyncio.Semaphore,
+    api_pool: Optional[queue.SimpleQueue],
+    ocr_cache: Dict[bytes, Optional[str]],
+) -> List[Optional[str]]:
+    """
+    OCR several page images concurrently.
+
+    Images whose content hash is already in `ocr_cache` are not recognized
+    again. Without tesserocr, large sets of same-resolution images go
+    through list files, one per concurrent slot.
+
+    Args:
+        images (List[Image.Image]): Rendered page images.
+        workers (int): Number of concurrent OCR slots.
+        semaphore (asyncio.Semaphore): Limits this document's concurrent runs.
+        api_pool (Optional[queue.SimpleQueue]): Idle tesserocr engines; None
+            to use Tesseract subprocesses.
+        ocr_cache (Dict[bytes, Optional[str]]): Results by content hash,
+            shared by every window of a document.
+
+    Returns:
+        List[Optional[str]]: OCR text for each image, in input order, or
+        None where recognition failed.
+    """
+    pending: Dict[bytes, Image.Image] = {}
+    keys = []
+    for image in images:
+        key = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        if key not in ocr_cache:
+            pending.setdefault(key, image)
+        keys.append(key)
+    if len(pending) < len(images):
+        log.info("Skipping OCR for %d repeated images.", len(images) - len(pending))
+
+    batch_keys: List[List[bytes]] = []
+    batch_jobs = []
+    single_keys: List[bytes] = list(pending)
+    if api_pool is None and len(pending) > OCR_BATCH_MIN_IMAGES:
+        # A list-file run takes a single --dpi, so batch by resolution
+        by_dpi: Dict[int, List[bytes]] = {}
+        for key, image in pending.items():
+            by_dpi.setdefault(image_dpi(image), []).append(key)
+        for group in by_dpi.values():
+            slots = min(workers, len(group))
+            bounds = [len(group) * i // slots for i in range(slots + 1)]
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                batch_keys.append(group[lo:hi])
+                batch_jobs.append(
+                    ocr_image_batch([pending[key] for key in group[lo:hi]], semaphore)
+                )
+        single_keys = []
+
+    batch_results, single_results = await asyncio.gather(
+        asyncio.gather(*batch_jobs),
+        asyncio.gather(
+            *(ocr_image(pending[key], semaphore, api_pool) for key in single_keys)
+        ),
+    )
+    for keys_in_batch, texts in zip(batch_keys, batch_results):
+        ocr_cache.update(zip(keys_in_batch, texts))
+    ocr_cache.update(zip(single_keys, single_results))
+
+    return [ocr_cache[key] for key in keys]
+
+
+async def ocr_image(
+    image: Image.Image,
+    semaphore: asyncio.Semaphore,
+    api_pool: Optional[queue.SimpleQueue] = None,
+) -> Optional[str]:
+    """
+    Run Tesseract on a single image.
+
+    Args:
+        image (Image.Image): Page image.
+        semaphore (asyncio.Semaphore): Limits this document's concurrent runs.
+        api_pool (Optional[queue.SimpleQueue]): Idle tesserocr engines; when
+            None, a Tesseract subprocess is spawned instead.
+
+    Returns:
+        Optional[str]: Recognized text, or None on failure.
+    """
+    async with semaphore, ocr_slot():
         try:
-            image = Image.open(io.BytesIO(image_obj.data))
-            ocr_result = pytesseract.image_to_string(image)
-            text_output += ocr_result
-            log.info("OCR successfully applied to image.")
+            if api_pool is None:
+                png_data = await asyncio.to_thread(prepare_png, image)
+                ocr_result: str = await aiopytesseract.image_to_string(
+                    png_data, dpi=image_dpi(image), timeout=OCR_TIMEOUT_PER_IMAGE
+                )
+            else:
+                # Engines match OCR_SLOTS one to one, so holding a slot
+                # guarantees an idle engine
+                api = api_pool.get_nowait()
+                try:
+                    # tesserocr releases the GIL, so engines run in parallel
+                    ocr_result = await asyncio.to_thread(recognize_image, api, image)
+                finally:
+                    api_pool.put(api)
+            log.debug("OCR successfully applied to image.")
+            return ocr_result
         except Exception as exc:
             log.error("Failed to run OCR on image: %s", exc)
+            return None
+
+
+async def ocr_image_batch(
+    images: List[Image.Image], semaphore: asyncio.Semaphore
+) -> List[Optional[str]]:
+    """
+    OCR many images with one Tesseract subprocess via an image list file.
+
+    Tesseract ends each image's text with a form feed, which is used to
+    split the combined output back into per-image results. All images must
+    share one resolution.
+
+    Args:
+        images (List[Image.Image]): Page images.
+        semaphore (asyncio.Semaphore): Limits this document's concurrent runs.
+
+    Returns:
+        List[Optional[str]]: Recognized text per image (all None on failure).
+    """
+    async with semaphore, ocr_slot():
+        work_dir = tempfile.mkdtemp(prefix="ocr_")
+        try:
+            image_paths = []
+            for idx, image in enumerate(images):
+                image_path = os.path.join(work_dir, f"img_{idx}.png")
+                with open(image_path, "wb") as image_file:
+                    image_file.write(prepare_png(image))
+                image_paths.append(image_path)
+
+            list_path = os.path.join(work_dir, "images.txt")
+            with open(list_path, "w") as list_file:
+                list_file.write("\n".join(image_paths) + "\n")
+
+            ocr_result: str = await aiopytesseract.image_to_string(
+                list_path,
+                dpi=image_dpi(images[0]),
+                timeout=OCR_TIMEOUT_PER_IMAGE * len(images),
+            )
+            log.info("OCR applied to %d images in one Tesseract run.", len(images))
+            texts: List[Optional[str]] = list(ocr_result.split("\f")[: len(images)])
+            return texts + [""] * (len(images) - len(texts))
+        except Exception as exc:
+            log.error("Failed to run batched OCR on %d images: %s", len(images), exc)
+            return [None] * len(images)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
 
-    return text_output
+def recognize_image(api: "PyTessBaseAPI", image: Image.Image) -> str:
+    """
+    Recognize text in an image with an in-process tesserocr engine.
+
+    Args:
+        api (PyTessBaseAPI): Initialized engine, used by one thread at a time.
+        image (Image.Image): Page image.
+
+    Returns:
+        str: Recognized text.
+    """
+    api.SetImage(prepare_image(image))
+    api.SetSourceResolution(image_dpi(image))
+    text: str = api.GetUTF8Text()
+    return text
+
+
+# ---------------------------------------------------------------------
+# Image preprocessing
+# ---------------------------------------------------------------------
+def image_dpi(image: Image.Image) -> int:
+    """
+    Return the resolution a page image was rendered at.
+
+    Args:
+        image (Image.Image): Page image from `render_pages`.
+
+    Returns:
+        int: Dots per inch, defaulting to the OCR_RENDER_SCALE resolution.
+    """
+    return int(image.info.get("dpi", (72 * OCR_RENDER_SCALE,))[0])
+
+
+def prepare_image(image: Image.Image) -> Image.Image:
+    """
+    Reduce an image to what Tesseract needs.
+
+    The image is converted to contrast-stretched grayscale; its size is
+    already bounded by `render_pages`. Binarization is left to Tesseract's
+    own Otsu step, which copes better with uneven backgrounds than a fixed
+    threshold.
+
+    Args:
+        image (Image.Image): Page image.
+
+    Returns:
+        Image.Image: Single-channel image ready for OCR.
+    """
+    # Pages are rendered in grayscale already; convert() would copy them anyway
+    if image.mode != "L":
+        image = image.convert("L")
+    return ImageOps.autocontrast(image)
+
+
+def prepare_png(image: Image.Image) -> bytes:
+    """
+    Preprocess an image and encode it as PNG for the Tesseract CLI.
+
+    Args:
+        image (Image.Image): Page image.
+
+    Returns:
+        bytes: PNG-encoded grayscale image.
+    """
+    buffer = io.BytesIO()
+    prepare_image(image).save(buffer, format="PNG")
+    return buffer.getvalue()
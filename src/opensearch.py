@@ -5,7 +5,11 @@ OpenSearch client utilities and hybrid search functionality.
 import logging
 from typing import Any, Dict, List
 
+import orjson
+import streamlit as st
 from opensearchpy import OpenSearch
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
 
 from src.constants import OPENSEARCH_HOST, OPENSEARCH_INDEX, OPENSEARCH_PORT
 from src.utils import setup_logging
@@ -16,13 +20,50 @@ from src.utils import setup_logging
 setup_logging()
 log = logging.getLogger(__name__)
 
+SEARCH_FILTER_PATH = "hits.hits._id,hits.hits._score,hits.hits._source"
+
+
+# ---------------------------------------------------------------------
+# Serialization
+# ---------------------------------------------------------------------
+class OrjsonSerializer(JSONSerializer):
+    """
+    JSON serializer backed by orjson.
+
+    NumPy arrays are written natively, so embedding vectors can be indexed
+    without first converting them to Python lists, and responses are decoded
+    by orjson's C parser instead of the stdlib json module.
+    """
+
+    def loads(self, s: Any) -> Any:
+        try:
+            return orjson.loads(s)
+        except (ValueError, TypeError) as exc:
+            raise SerializationError(s, exc)
+
+    def dumps(self, data: Any) -> Any:
+        # Strings are sent as-is, matching the default serializer
+        if isinstance(data, str):
+            return data
+
+        try:
+            return orjson.dumps(
+                data, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY
+            ).decode("utf-8")
+        except (ValueError, TypeError) as exc:
+            raise SerializationError(data, exc)
+
 
 # ---------------------------------------------------------------------
 # Client initialization
 # ---------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
 def get_opensearch_client() -> OpenSearch:
     """
-    Create and return an OpenSearch client instance.
+    Create an OpenSearch client once and share it across reruns and sessions.
+
+    The client keeps a pool of persistent connections, so searches and bulk
+    requests reuse open sockets instead of reconnecting.
 
     Returns:
         OpenSearch: Configured client object.
@@ -30,9 +71,11 @@ def get_opensearch_client() -> OpenSearch:
     client = OpenSearch(
         hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
         http_compress=True,
+        pool_maxsize=32,
         timeout=30,
         max_retries=3,
         retry_on_timeout=True,
+        serializer=OrjsonSerializer(),
     )
     log.info("OpenSearch client initialized and ready.")
     return client
@@ -47,6 +90,10 @@ def hybrid_search(
     """
     Run a hybrid search (text + vector) against the OpenSearch index.
 
+    Both sub-queries travel in a single `hybrid` request and are executed
+    and score-normalized server-side by the search pipeline, so no extra
+    round trip is needed per query.
+
     Args:
         query_text (str): Text query for full-text search.
         query_embedding (List[float]): Embedding vector for ANN search.
@@ -70,10 +117,15 @@ def hybrid_search(
         "size": top_k,
     }
 
+    # Only the hits are read, so drop shard/timing metadata from the response
     response = client.search(
-        index=OPENSEARCH_INDEX, body=body, search_pipeline="nlp-search-pipeline"
+        index=OPENSEARCH_INDEX,
+        body=body,
+        search_pipeline="nlp-search-pipeline",
+        filter_path=SEARCH_FILTER_PATH,
     )
     log.info("Hybrid search executed for query='%s' with top_k=%d.", query_text, top_k)
 
-    results: List[Dict[str, Any]] = response["hits"]["hits"]
+    # filter_path omits "hits" entirely when nothing matched
+    results: List[Dict[str, Any]] = response.get("hits", {}).get("hits", [])
     return results
@@ -1,35 +1,90 @@
 """
-Utility helpers for logging, text cleaning, and text chunking.
+Utility helpers for logging, page styling, text cleaning, and text chunking.
 """
 
+import atexit
 import logging
+import os
+import queue
 import re
-from typing import List
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, List, Optional
 
-from src.constants import LOG_FILE_PATH
+import numpy as np
+import streamlit as st
 
+from src.constants import CSS_FILE_PATH, LOG_FILE_PATH
 
 # ---------------------------------------------------------------------
 # Logging configuration
 # ---------------------------------------------------------------------
+_log_listener: Optional[QueueListener] = None
+_log_listener_pid: Optional[int] = None
+
+
 def setup_logging() -> None:
     """
     Configure application-wide logging.
 
     Logs are written to the path defined in constants, with
     timestamps, severity level, and message text included.
+
+    Log calls only enqueue the record; a background listener thread formats
+    and writes it, so file I/O stays off extraction and request paths. Every
+    module calls this on import, but only the first call in each process
+    does any work.
     """
-    logging.basicConfig(
-        filename=LOG_FILE_PATH,
-        filemode="a",
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        level=logging.INFO,
+    global _log_listener, _log_listener_pid
+    if _log_listener_pid == os.getpid():
+        return
+
+    file_handler = logging.FileHandler(LOG_FILE_PATH, mode="a")
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     )
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    # A forked child process would inherit the parent's queue handler, but
+    # not the listener thread draining it, so any such handler is replaced.
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    _log_listener = QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    _log_listener_pid = os.getpid()
+
+
+# ---------------------------------------------------------------------
+# Page styling
+# ---------------------------------------------------------------------
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """
+    Read the shared page stylesheet once and wrap it in a <style> block.
+
+    Returns:
+        str: HTML snippet ready for `st.markdown(..., unsafe_allow_html=True)`.
+    """
+    with open(CSS_FILE_PATH, "r") as css_file:
+        return f"<style>{css_file.read()}</style>"
 
 
 # ---------------------------------------------------------------------
 # Text cleanup
 # ---------------------------------------------------------------------
+_RE_HYPHEN = re.compile(r"(\w+)-\n(\w+)")
+_RE_INLINE_NL = re.compile(r"(?<!\n)\n(?!\n)")
+_RE_MULTI_NL = re.compile(r"\n+")
+# Only runs that change (tabs, or two or more blanks) are matched; single
+# spaces, the vast majority, are left alone instead of replaced with themselves.
+_RE_WS = re.compile(r"[ \t]{2,}|\t")
+
+
 def clean_text(text: str) -> str:
     """
     Normalize OCR-extracted or raw text by removing artifacts.
@@ -46,17 +101,24 @@ def clean_text(text: str) -> str:
     Returns:
         str: Cleaned text string.
     """
+    # Each pass is skipped when a substring check (a C-level scan) shows it
+    # has nothing to match, which is common for born-digital PDF text.
+
     # Merge words split by hyphen at line breaks
-    text = re.sub(r"(\w+)-\n(\w+)", r"\1\2", text)
+    if "-\n" in text:
+        text = _RE_HYPHEN.sub(r"\1\2", text)
 
-    # Convert single newlines inside sentences into spaces
-    text = re.sub(r"(?<!\n)\n(?!\n)", " ", text)
+    if "\n" in text:
+        # Convert single newlines inside sentences into spaces
+        text = _RE_INLINE_NL.sub(" ", text)
 
-    # Collapse multiple newlines
-    text = re.sub(r"\n+", "\n", text)
+        # Collapse multiple newlines
+        if "\n\n" in text:
+            text = _RE_MULTI_NL.sub("\n", text)
 
     # Remove repeated spaces/tabs
-    text = re.sub(r"[ \t]+", " ", text)
+    if "  " in text or "\t" in text:
+        text = _RE_WS.sub(" ", text)
 
     result = text.strip()
     logging.info("Text cleaned successfully.")
@@ -66,35 +128,80 @@ def clean_text(text: str) -> str:
 # ---------------------------------------------------------------------
 # Text chunking
 # ---------------------------------------------------------------------
-def chunk_text(text: str, chunk_size: int, overlap: int = 100) -> List[str]:
+def iter_chunks(
+    text: str, chunk_size: int, overlap: int = 100, already_clean: bool = False
+) -> Iterator[str]:
     """
-    Split text into overlapping chunks of tokens.
+    Split text into overlapping chunks of tokens, yielding them lazily.
+
+    Token boundaries and chunk windows are computed as NumPy offset arrays,
+    and each chunk is a single slice of the normalized text rather than a
+    join over a list of tokens.
 
     Args:
         text (str): Input text.
         chunk_size (int): Max number of tokens per chunk.
         overlap (int): Number of tokens shared between consecutive chunks.
+        already_clean (bool): Skip `clean_text` because the caller already
+            normalized the text (e.g. output of `extract_text_from_pdf`).
 
-    Returns:
-        List[str]: List of text chunks.
+    Yields:
+        str: Text chunks in document order.
     """
-    normalized = clean_text(text)
-    logging.info("Text normalized for chunking.")
-
-    tokens = normalized.split(" ")
-    chunks: List[str] = []
-
-    start = 0
-    while start < len(tokens):
-        end = start + chunk_size
-        chunk = " ".join(tokens[start:end])
-        chunks.append(chunk)
-        start = end - overlap  # Overlap handling
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    if already_clean:
+        normalized = text
+    else:
+        normalized = clean_text(text)
+        logging.info("Text normalized for chunking.")
+
+    # Character offsets of every space. Byte offsets equal character offsets
+    # only for ASCII text; otherwise scan UTF-32, one code unit per character.
+    if normalized.isascii():
+        codepoints = np.frombuffer(normalized.encode("ascii"), dtype=np.uint8)
+    else:
+        codepoints = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32)
+    spaces = np.flatnonzero(codepoints == 0x20)
+
+    # Token i spans normalized[token_starts[i]:token_ends[i]]
+    token_starts = np.concatenate(([0], spaces + 1))
+    token_ends = np.append(spaces, len(normalized))
+    num_tokens = len(token_starts)
+
+    # Window i covers tokens [starts[i], ends[i]); step is chunk_size - overlap
+    starts = np.arange(0, num_tokens, chunk_size - overlap)
+    ends = np.minimum(starts + chunk_size, num_tokens)
+
+    chunk_bounds = zip(token_starts[starts].tolist(), token_ends[ends - 1].tolist())
+    for first, last in chunk_bounds:
+        yield normalized[first:last]
 
     logging.info(
         "Text divided into %d chunks (size=%d, overlap=%d).",
-        len(chunks),
+        len(starts),
         chunk_size,
         overlap,
     )
-    return chunks
+
+
+def chunk_text(
+    text: str, chunk_size: int, overlap: int = 100, already_clean: bool = False
+) -> List[str]:
+    """
+    Split text into overlapping chunks of tokens.
+
+    Eager counterpart of `iter_chunks`, for callers that need every chunk at
+    once; streaming consumers should iterate `iter_chunks` directly.
+
+    Args:
+        text (str): Input text.
+        chunk_size (int): Max number of tokens per chunk.
+        overlap (int): Number of tokens shared between consecutive chunks.
+        already_clean (bool): Skip `clean_text` (see `iter_chunks`).
+
+    Returns:
+        List[str]: List of text chunks.
+    """
+    return list(iter_chunks(text, chunk_size, overlap, already_clean))